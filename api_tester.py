@@ -3,14 +3,15 @@
 """
 api_tester.py — Tool tạo test case tự động từ 1 lệnh cURL và chạy kiểm thử API (CLI + mini UI)
 
-BẢN SỬA LỖI (SystemExit: 1 khi chạy UI + sandbox không có socket.SO_REUSEADDR):
-- Tiếp tục tránh "SystemExit: 1" khi Flask không bind được cổng: thử nhiều host (0.0.0.0 → 127.0.0.1 → localhost), tăng port +1..+20, cuối cùng dùng port=0 (OS random), bắt `SystemExit`/`OSError` và không làm sập tiến trình.
-- **Sửa crash `AttributeError: socket.SO_REUSEADDR`**: BỎ HẲN `setsockopt(...)` trong `_port_free` (một số sandbox không có hằng số này). Chỉ cần `bind()` thử là đủ kiểm tra khả dụng.
-- Đã thay toàn bộ in lỗi sang `sys.stderr.write(...)` khi cần, giữ UI `use_reloader=False`.
+Khởi động UI:
+- Socket UI được bind + listen sẵn rồi giao thẳng cho server (waitress nếu có, không thì werkzeug), không qua `app.run` → không còn khe hở giữa lúc chọn port và lúc server bind.
+- `_ui_candidates` dựng danh sách (host, port): mỗi host (0.0.0.0 → 127.0.0.1 → localhost, bỏ host trùng) quét port +0..+20, cuối cùng port 0 (OS chọn); `_bind_first` lấy cặp đầu tiên bind được. Không bind được thì in hướng dẫn dùng CLI, không làm sập tiến trình.
+- `SO_REUSEADDR` chỉ đặt khi có hằng số này (một số sandbox không có) và không phải Windows.
+- Lỗi ghi ra `sys.stderr.write(...)`.
 - KHÔNG thay đổi các test case cũ; vẫn giữ các case đã bổ sung: `empty_body`, `malformed_json`, `wrong_accept_header`.
 
 Cài đặt:
-  pip install requests flask
+  pip install requests flask aiohttp orjson waitress   # aiohttp, orjson, waitress tuỳ chọn (song song, JSON nhanh, UI đa luồng)
 
 Cách chạy nhanh:
   # 1) Không tham số → tự mở UI (tự chọn host/port khả dụng)
@@ -28,41 +29,79 @@ Lưu ý:
 from __future__ import annotations
 
 import argparse
-import copy
-import dataclasses
-import errno
+import asyncio
+import gzip
+import hashlib
 import html
 import json
+import math
 import os
 import re
 import shlex
 import socket
+import ssl
 import sys
+import threading
 import time
 import tempfile
 import io
 import zipfile
 import shutil
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from http.cookiejar import DefaultCookiePolicy
+from pathlib import Path
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Any
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:  # pragma: no cover
     sys.stderr.write("Thiếu thư viện 'requests'. Vui lòng chạy: pip install requests\n")
     raise
 
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # không có aiohttp → chạy tuần tự bằng requests
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # không có orjson → dùng json của stdlib
+
+try:
+    import waitress
+except ImportError:  # pragma: no cover
+    waitress = None  # không có waitress → dùng server của werkzeug
+
 
 # --------------------------
 # Mô hình dữ liệu
 # --------------------------
+def _lc_index(headers: Mapping[str, str]) -> Dict[str, str]:
+    """Tên header viết thường → tên gốc; trùng tên khác hoa/thường thì giữ header khai báo trước."""
+    return {k.lower(): k for k in reversed(headers)}
+
+
 @dataclass
 class ParsedCurl:
     method: str
     url: str
-    headers: Dict[str, str] = field(default_factory=dict)
+    headers: Mapping[str, str] = field(default_factory=dict)
     data: Optional[str] = None
     verify_ssl: bool = True
+    # tên header viết thường → tên gốc (dựng 1 lần, dùng cho mọi phép dò header)
+    headers_lc_index: Mapping[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.headers_lc_index = _lc_index(self.headers)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"method": self.method, "url": self.url, "headers": dict(self.headers),
+                "data": self.data, "verify_ssl": self.verify_ssl}
 
 
 @dataclass
@@ -71,13 +110,12 @@ class TestCase:
     description: str
     method: str
     url: str
-    headers: Dict[str, str]
+    headers: Mapping[str, str]
     body: Optional[str]
-    expect: Dict[str, Any]
+    expect: Mapping[str, Any]
 
 
-@dataclass
-class TestResult:
+class TestResult(NamedTuple):
     name: str
     description: str
     method: str
@@ -94,6 +132,20 @@ class TestResult:
 DEFAULT_TIMEOUT = int(os.getenv("API_TESTER_TIMEOUT", "30"))
 DEFAULT_PORT = int(os.getenv("PORT", "8787"))
 DEFAULT_HOST = os.getenv("BIND_HOST", "0.0.0.0")
+# Số test case gửi song song tối đa (khi có aiohttp)
+DEFAULT_CONCURRENCY = max(1, int(os.getenv("API_TESTER_CONCURRENCY", "8")))
+# Số kết nối đồng thời tối đa tới cùng 1 host (tránh dồn tải/rate-limit API đang test).
+# Cả 2 giới hạn tối thiểu là 1: Semaphore(0) làm lượt chạy treo vĩnh viễn
+DEFAULT_PER_HOST = max(1, int(os.getenv("API_TESTER_PER_HOST", "4")))
+# Số thread phục vụ UI khi chạy bằng waitress
+UI_THREADS = int(os.getenv("API_TESTER_UI_THREADS", "8"))
+
+# Session dùng chung: giữ kết nối keep-alive (TCP + TLS) giữa các request tới cùng host
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0))
+# Không lưu cookie giữa các test case (giữ hành vi độc lập như requests.request)
+_SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
 
 # Cache cho token Authorization (dùng lại cho các request tiếp theo)
 _AUTH_TOKEN_CACHE: Optional[str] = None
@@ -117,10 +169,60 @@ def _clear_auth_token() -> None:
     global _AUTH_TOKEN_CACHE
     _AUTH_TOKEN_CACHE = None
 
+
+def _with_auth(headers: Mapping[str, str], token: Optional[str]) -> Mapping[str, str]:
+    """Thêm Authorization=`token` nếu case chưa có (không đọc/ghi cache, không sửa `headers`)."""
+    if not token or "Authorization" in headers or "authorization" in headers:
+        return headers
+    return {**headers, "Authorization": token}
+
 # --------------------------
-# cURL parser đơn giản (dùng shlex)
+# cURL parser đơn giản (regex scanner, fallback shlex)
 # --------------------------
 _CTYPE_JSON = "application/json"
+_URL_PREFIXES = ("http://", "https://")
+_PATH_ID_RE = re.compile(r"/(\d+)(?=/|$)")
+
+# Tokenizer cho cURL: tách từ giống shlex.split (POSIX) bằng 1 regex biên dịch sẵn.
+# Nhóm: 1=khoảng trắng (ngăn từ), 2='...', 3="...", 4=\x, 5=chuỗi không nháy; các mảnh liền nhau ghép thành 1 từ.
+_DQ_ESCAPE_RE = re.compile(r'\\([\\"])')
+_CURL_TOKEN_RE = re.compile(r"""([ \t\r\n]+)|'([^']*)'|"((?:[^"\\]|\\.)*)"|\\(.)|([^ \t\r\n'"\\]+)""", re.DOTALL)
+
+# Option cURL → loại tham số (mọi loại trừ "insecure" đều nhận 1 đối số phía sau)
+_CURL_OPTS = {
+    "-X": "method", "--request": "method",
+    "-H": "header", "--header": "header",
+    "--data": "data", "--data-raw": "data", "--data-binary": "data", "--data-ascii": "data", "-d": "data",
+    "--url": "url",
+    "--insecure": "insecure", "-k": "insecure",
+}
+
+
+def _split_curl(curl_cmd: str) -> List[str]:
+    """Tách token như `shlex.split`; gặp cú pháp regex không hỗ trợ
+    (nháy chưa đóng, `\\` ở cuối...) thì quay về shlex."""
+    tokens: List[str] = []
+    word: Optional[str] = None
+    pos = 0
+    for m in _CURL_TOKEN_RE.finditer(curl_cmd):
+        if m.start() != pos:
+            return shlex.split(curl_cmd)
+        pos = m.end()
+        kind = m.lastindex
+        if kind == 1:
+            if word is not None:
+                tokens.append(word)
+                word = None
+            continue
+        piece = m.group(kind)
+        if kind == 3:
+            piece = _DQ_ESCAPE_RE.sub(r"\1", piece)
+        word = piece if word is None else word + piece
+    if pos != len(curl_cmd):
+        return shlex.split(curl_cmd)
+    if word is not None:
+        tokens.append(word)
+    return tokens
 
 
 def parse_curl(curl_cmd: str) -> ParsedCurl:
@@ -135,43 +237,37 @@ def parse_curl(curl_cmd: str) -> ParsedCurl:
         # cho phép dán không có từ 'curl' đầu
         curl_cmd = "curl " + curl_cmd.strip()
 
-    tokens = shlex.split(curl_cmd)
+    tokens = _split_curl(curl_cmd)
     method = None
     headers: Dict[str, str] = {}
     data = None
     verify_ssl = True
     url = None
 
+    n = len(tokens)
     i = 1  # skip 'curl'
-    while i < len(tokens):
+    while i < n:
         t = tokens[i]
-        if t in ("-X", "--request") and i + 1 < len(tokens):
-            method = tokens[i + 1].upper()
-            i += 2
-        elif t in ("-H", "--header") and i + 1 < len(tokens):
-            hv = tokens[i + 1]
-            # chấp nhận 'Key: value'
-            if ":" in hv:
-                k, v = hv.split(":", 1)
-                headers[k.strip()] = v.strip()
-            i += 2
-        elif t in ("--data", "--data-raw", "--data-binary", "--data-ascii", "-d") and i + 1 < len(tokens):
-            data = tokens[i + 1]
-            i += 2
-        elif t in ("--insecure", "-k"):
+        kind = _CURL_OPTS.get(t)
+        if kind == "insecure":
             verify_ssl = False
+        elif kind is not None and i + 1 < n:
+            v = tokens[i + 1]
+            if kind == "method":
+                method = v.upper()
+            elif kind == "header":
+                # chấp nhận 'Key: value'
+                if ":" in v:
+                    k, hv = v.split(":", 1)
+                    headers[k.strip()] = hv.strip()
+            elif kind == "data":
+                data = v
+            else:
+                url = v
             i += 1
-        elif t.startswith("http://") or t.startswith("https://"):
+        elif t.startswith(_URL_PREFIXES):
             url = t
-            i += 1
-        elif t == "--url" and i + 1 < len(tokens):
-            url = tokens[i + 1]
-            i += 2
-        else:
-            # có thể là URL ở cuối mà không có tiền tố option
-            if i == len(tokens) - 1 and (t.startswith("http://") or t.startswith("https://")):
-                url = t
-            i += 1
+        i += 1
 
     # Suy đoán method
     if not method:
@@ -187,9 +283,12 @@ def parse_curl(curl_cmd: str) -> ParsedCurl:
 # Hỗ trợ phân tích body & sinh biến thể
 # --------------------------
 
-def is_json_content(headers: Dict[str, str], body: Optional[str]) -> bool:
-    ct = headers.get("Content-Type") or headers.get("content-type")
-    if ct and _CTYPE_JSON in ct.lower():
+def is_json_content(headers: Dict[str, str], body: Optional[str],
+                    lc_index: Optional[Dict[str, str]] = None) -> bool:
+    if lc_index is None:
+        lc_index = _lc_index(headers)
+    ct_key = lc_index.get("content-type")
+    if ct_key and _CTYPE_JSON in headers[ct_key].lower():
         return True
     if body:
         b = body.strip()
@@ -198,7 +297,35 @@ def is_json_content(headers: Dict[str, str], body: Optional[str]) -> bool:
     return False
 
 
+def _has_non_finite(obj: Any) -> bool:
+    """True nếu obj chứa float NaN/Infinity (orjson ghi thành null, stdlib ghi NaN/Infinity)."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    return False
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """json.dumps(ensure_ascii=False) dạng gọn, dùng orjson nếu có.
+
+    Fallback stdlib với số nguyên > 64-bit và NaN/Infinity (orjson đổi thành null) →
+    cùng dữ liệu cho cùng output dù có cài orjson hay không."""
+    if orjson is not None and not _has_non_finite(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+        except TypeError:
+            pass
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 def try_parse_json(text: Optional[str]) -> Tuple[bool, Any]:
+    # Giữ json.loads của stdlib: orjson đổi số nguyên > 64-bit thành float, làm sai body gửi đi
+
     if text is None:
         return False, None
     try:
@@ -209,7 +336,7 @@ def try_parse_json(text: Optional[str]) -> Tuple[bool, Any]:
 
 def detect_path_id(url: str) -> Optional[Tuple[str, str]]:
     """Tìm số trong path để thử thay đổi (id). Trả về (pattern, replacement)."""
-    m = re.search(r"/(\d+)(?=/|$)", url)
+    m = _PATH_ID_RE.search(url)
     if m:
         old = m.group(1)
         new = "9999999" if old in ("0", "1") else "-1"
@@ -221,13 +348,12 @@ def detect_path_id(url: str) -> Optional[Tuple[str, str]]:
 # Sinh test cases từ ParsedCurl (GIỮ NGUYÊN + bổ sung hợp lệ)
 # --------------------------
 
-def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
-    cases: List[TestCase] = []
-
+def generate_testcases(pc: ParsedCurl) -> Iterator[TestCase]:
+    """Sinh lần lượt từng test case (generator: case đầu có thể được gửi trước khi sinh xong các case sau)."""
     headers = dict(pc.headers)
 
     # 1) Baseline (giữ nguyên)
-    cases.append(TestCase(
+    yield TestCase(
         name="baseline",
         description="Gửi đúng theo cURL gốc.",
         method=pc.method,
@@ -235,12 +361,12 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
         headers=headers,
         body=pc.data,
         expect={"accept_any": True},
-    ))
+    )
 
     # 2) Thiếu Authorization (giữ nguyên)
-    if any(k.lower() == "authorization" for k in headers):
+    if "authorization" in pc.headers_lc_index:
         no_auth_headers = {k: v for k, v in headers.items() if k.lower() != "authorization"}
-        cases.append(TestCase(
+        yield TestCase(
             name="missing_auth",
             description="Bỏ header Authorization => kỳ vọng 401/403.",
             method=pc.method,
@@ -248,11 +374,11 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
             headers=no_auth_headers,
             body=pc.data,
             expect={"status_in": [401, 403]},
-        ))
+        )
 
     # 3) Sai method (giữ nguyên)
     alt_method = "GET" if pc.method != "GET" else "POST"
-    cases.append(TestCase(
+    yield TestCase(
         name="wrong_method",
         description=f"Dùng method {alt_method} thay cho {pc.method} => kỳ vọng không 2xx.",
         method=alt_method,
@@ -260,42 +386,42 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
         headers=headers,
         body=pc.data if alt_method in ("POST", "PUT", "PATCH") else None,
         expect={"not_2xx": True},
-    ))
+    )
 
-    # Phát hiện JSON
-    json_like = is_json_content(headers, pc.data)
+    # Phát hiện JSON (các biến thể chỉ sửa key cấp 1 → copy nông `dict(body_json)` là đủ)
+    json_like = is_json_content(headers, pc.data, pc.headers_lc_index)
     ok_json, body_json = try_parse_json(pc.data) if json_like else (False, None)
 
     # 4) Thiếu 1 field JSON (giữ nguyên)
     if ok_json and isinstance(body_json, dict) and body_json:
         key_to_remove = next(iter(body_json.keys()))
-        missing_json = copy.deepcopy(body_json)
+        missing_json = dict(body_json)
         missing_json.pop(key_to_remove, None)
-        cases.append(TestCase(
+        yield TestCase(
             name="missing_field",
             description=f"Bỏ field bất kỳ '{key_to_remove}' trong JSON => kỳ vọng 4xx.",
             method=pc.method,
             url=pc.url,
             headers=headers,
-            body=json.dumps(missing_json, ensure_ascii=False),
+            body=_json_dumps(missing_json),
             expect={"is_4xx": True},
-        ))
+        )
 
     # 5) Sai kiểu dữ liệu trường đầu tiên (giữ nguyên)
     if ok_json and isinstance(body_json, dict) and body_json:
         k0 = next(iter(body_json.keys()))
-        bad_json = copy.deepcopy(body_json)
+        bad_json = dict(body_json)
         v0 = bad_json[k0]
         bad_json[k0] = ("not-a-number" if isinstance(v0, (int, float)) else 12345)
-        cases.append(TestCase(
+        yield TestCase(
             name="invalid_type",
             description=f"Đổi kiểu dữ liệu field '{k0}' => kỳ vọng 4xx.",
             method=pc.method,
             url=pc.url,
             headers=headers,
-            body=json.dumps(bad_json, ensure_ascii=False),
+            body=_json_dumps(bad_json),
             expect={"is_4xx": True},
-        ))
+        )
 
     # 6) Chuỗi quá dài (giữ nguyên)
     if ok_json and isinstance(body_json, dict):
@@ -305,21 +431,21 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
                 str_key = k
                 break
         if str_key is not None:
-            long_json = copy.deepcopy(body_json)
+            long_json = dict(body_json)
             long_json[str_key] = "A" * 2000
-            cases.append(TestCase(
+            yield TestCase(
                 name="too_long_string",
                 description=f"Tăng chiều dài chuỗi field '{str_key}' lên 2000 ký tự => kỳ vọng 4xx.",
                 method=pc.method,
                 url=pc.url,
                 headers=headers,
-                body=json.dumps(long_json, ensure_ascii=False),
+                body=_json_dumps(long_json),
                 expect={"is_4xx": True},
-            ))
+            )
 
     # 7) SQLi thử nghiệm (giữ nguyên)
     if ok_json and isinstance(body_json, dict):
-        sqli_json = copy.deepcopy(body_json)
+        sqli_json = dict(body_json)
         injected = False
         for k, v in sqli_json.items():
             if isinstance(v, str):
@@ -327,22 +453,22 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
                 injected = True
                 break
         if injected:
-            cases.append(TestCase(
+            yield TestCase(
                 name="sqli_probe",
                 description="Thử payload SQLi đơn giản => kỳ vọng KHÔNG 5xx.",
                 method=pc.method,
                 url=pc.url,
                 headers=headers,
-                body=json.dumps(sqli_json, ensure_ascii=False),
+                body=_json_dumps(sqli_json),
                 expect={"not_5xx": True},
-            ))
+            )
 
     # 8) Đổi path id nếu có (giữ nguyên)
     id_pat = detect_path_id(pc.url)
     if id_pat:
         old, new = id_pat
         new_url = pc.url.replace(f"/{old}", f"/{new}")
-        cases.append(TestCase(
+        yield TestCase(
             name="path_id_variant",
             description=f"Thay id trong path {old} -> {new} => kỳ vọng 4xx hoặc 404.",
             method=pc.method,
@@ -350,13 +476,13 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
             headers=headers,
             body=pc.data,
             expect={"status_in": [400, 401, 403, 404]},
-        ))
+        )
 
     # 9) Sai Content-Type (giữ nguyên)
     if json_like:
         ct_headers = dict(headers)
         ct_headers["Content-Type"] = "text/plain"
-        cases.append(TestCase(
+        yield TestCase(
             name="wrong_content_type",
             description="Đổi Content-Type thành text/plain với body JSON => kỳ vọng 4xx/415.",
             method=pc.method,
@@ -364,10 +490,10 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
             headers=ct_headers,
             body=pc.data,
             expect={"is_4xx_or_415": True},
-        ))
+        )
 
     # 10) Replay/Idempotency (giữ nguyên)
-    cases.append(TestCase(
+    yield TestCase(
         name="replay_same_request",
         description="Gửi lại cùng request 2 lần => kỳ vọng status giống nhau (ổn định).",
         method=pc.method,
@@ -375,13 +501,13 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
         headers=headers,
         body=pc.data,
         expect={"stable_status": True},
-    ))
+    )
 
     # ----------------------
     # BỔ SUNG TEST CASE (đã thêm trước)
     # ----------------------
     if pc.method in ("POST", "PUT", "PATCH") and pc.data is not None:
-        cases.append(TestCase(
+        yield TestCase(
             name="empty_body",
             description="Gửi body rỗng cho API vốn có body => kỳ vọng 4xx.",
             method=pc.method,
@@ -389,10 +515,10 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
             headers=headers,
             body="",
             expect={"is_4xx": True},
-        ))
+        )
 
-    if is_json_content(headers, pc.data) and pc.data:
-        cases.append(TestCase(
+    if json_like and pc.data:
+        yield TestCase(
             name="malformed_json",
             description="Body JSON sai cú pháp (thiếu ngoặc/ngoặc thừa) => kỳ vọng 4xx.",
             method=pc.method,
@@ -400,11 +526,11 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
             headers={**headers, "Content-Type": "application/json"},
             body=(pc.data.rstrip() + "]"),
             expect={"is_4xx": True},
-        ))
+        )
 
     wrong_accept_headers = dict(headers)
     wrong_accept_headers["Accept"] = "application/xml"
-    cases.append(TestCase(
+    yield TestCase(
         name="wrong_accept_header",
         description="Đặt Accept=application/xml cho API thường trả JSON => kỳ vọng KHÔNG 5xx.",
         method=pc.method,
@@ -412,44 +538,110 @@ def generate_testcases(pc: ParsedCurl) -> List[TestCase]:
         headers=wrong_accept_headers,
         body=pc.data,
         expect={"not_5xx": True},
-    ))
+    )
+
 
-    return cases
+@lru_cache(maxsize=128)
+def _parse_and_generate(curl_cmd: str) -> Tuple[ParsedCurl, Tuple[TestCase, ...]]:
+    """Parse + sinh case, cache theo nguyên chuỗi cURL (UI hay gửi lại cùng 1 lệnh).
+
+    Kết quả dùng chung giữa các lượt chạy nên headers/expect được bọc MappingProxyType
+    (chỉ đọc); dữ liệu trả ra ngoài (to_dict, request_headers) luôn là bản sao."""
+    pc = parse_curl(curl_cmd)
+    cases = tuple(replace(tc, headers=MappingProxyType(dict(tc.headers)), expect=MappingProxyType(dict(tc.expect)))
+                  for tc in generate_testcases(pc))
+    pc = replace(pc, headers=MappingProxyType(dict(pc.headers)))
+    pc.headers_lc_index = MappingProxyType(pc.headers_lc_index)
+    return pc, cases
 
 
 # --------------------------
 # Thực thi test cases
 # --------------------------
 
-def mask_sensitive(h: Dict[str, str]) -> Dict[str, str]:
+_SENSITIVE_HEADERS = frozenset({"authorization", "api-key", "x-api-key", "token", "x-token", "cookie"})
+
+
+def mask_sensitive(h: Mapping[str, str]) -> Dict[str, str]:
+    """Che giá trị header nhạy cảm; luôn trả dict mới (không trỏ vào headers của case đã cache)."""
+    lowered = [k.lower() for k in h]
+    if _SENSITIVE_HEADERS.isdisjoint(lowered):
+        return dict(h)
     masked = {}
-    for k, v in h.items():
-        if k.lower() in ("authorization", "api-key", "x-api-key", "token", "x-token", "cookie"):
+    for (k, v), lk in zip(h.items(), lowered):
+        if lk in _SENSITIVE_HEADERS:
             masked[k] = ("***" if len(v) <= 8 else v[:4] + "***" + v[-4:])
         else:
             masked[k] = v
     return masked
 
 
+# Preview response: chỉ đọc tối đa _PREVIEW_BYTES từ socket (đủ cho 800 ký tự UTF-8)
+_PREVIEW_CHARS = 800
+_PREVIEW_BYTES = 4096
+
+
+def _preview_text(raw: bytes, encoding: Optional[str]) -> str:
+    try:
+        preview = raw.decode(encoding or "utf-8", "replace")
+    except LookupError:
+        preview = raw.decode("utf-8", "replace")
+    if len(preview) > _PREVIEW_CHARS:
+        preview = preview[:_PREVIEW_CHARS] + "..."
+    return preview
+
+
 def send_request(method: str, url: str, headers: Dict[str, str], body: Optional[str], verify_ssl: bool, timeout: int) -> Tuple[int, int, str]:
     headers = _apply_auth_token(headers or {})
-    start = time.time()
+    status, elapsed_ms, preview = _send_sync(method, url, headers, body, verify_ssl, timeout)
+    if status in (401, 403):
+        _clear_auth_token()
+    return status, elapsed_ms, preview
+
+
+def _send_sync(method: str, url: str, headers: Mapping[str, str], body: Optional[str], verify_ssl: bool,
+               timeout: int) -> Tuple[int, int, str]:
+    """Gửi 1 request bằng requests với đúng `headers` truyền vào (không đụng cache token)."""
+    start = time.perf_counter_ns()
     try:
-        resp = requests.request(method=method, url=url, headers=headers or None,
-                                data=body if body is not None else None,
-                                timeout=timeout, verify=verify_ssl)
-        elapsed_ms = int((time.time() - start) * 1000)
-        if resp.status_code in (401, 403):
-            _clear_auth_token()
-        preview = resp.text
-        if len(preview) > 800:
-            preview = preview[:800] + "..."
-        return resp.status_code, elapsed_ms, preview
+        with _SESSION.request(method=method, url=url, headers=headers or None,
+                              data=body if body is not None else None,
+                              timeout=timeout, verify=verify_ssl, stream=True) as resp:
+            raw = bytearray()
+            for chunk in resp.iter_content(_PREVIEW_BYTES):
+                raw += chunk
+                if len(raw) >= _PREVIEW_BYTES:
+                    break
+            elapsed_ms = (time.perf_counter_ns() - start) // 1_000_000
+        return resp.status_code, elapsed_ms, _preview_text(bytes(raw), resp.encoding)
     except requests.RequestException as e:
-        elapsed_ms = int((time.time() - start) * 1000)
+        elapsed_ms = (time.perf_counter_ns() - start) // 1_000_000
         return -1, elapsed_ms, f"ERROR: {e}"
 
 
+async def _send_async(session: "aiohttp.ClientSession", tc: TestCase, headers: Mapping[str, str],
+                      timeout: int) -> Tuple[int, int, str]:
+    """Bản async của `_send_sync` (dùng chung session/connector cho cả lượt chạy)."""
+    data = tc.body.encode("utf-8") if tc.body is not None else None
+    start = time.perf_counter_ns()
+    try:
+        # timeout theo từng thao tác socket (như requests), không tính thời gian chờ kết nối trong pool
+        async with session.request(tc.method, tc.url, headers=headers or None, data=data,
+                                   timeout=aiohttp.ClientTimeout(sock_connect=timeout, sock_read=timeout)) as resp:
+            raw = bytearray()
+            while len(raw) < _PREVIEW_BYTES:
+                chunk = await resp.content.read(_PREVIEW_BYTES - len(raw))
+                if not chunk:
+                    break
+                raw += chunk
+        elapsed_ms = (time.perf_counter_ns() - start) // 1_000_000
+        return resp.status, elapsed_ms, _preview_text(bytes(raw), resp.charset)
+    except Exception as e:
+        # mọi lỗi của 1 request (vd. ValueError khi header chứa ký tự điều khiển) chỉ làm hỏng case đó
+        elapsed_ms = (time.perf_counter_ns() - start) // 1_000_000
+        return -1, elapsed_ms, f"ERROR: {str(e) or type(e).__name__}"
+
+
 def evaluate(expect: Dict[str, Any], status: int) -> Tuple[bool, str]:
     if expect.get("accept_any"):
         return True, "Baseline chấp nhận mọi kết quả"
@@ -469,6 +661,31 @@ def evaluate(expect: Dict[str, Any], status: int) -> Tuple[bool, str]:
     return True, "Không có kỳ vọng cụ thể"
 
 
+def _build_result(tc: TestCase, sends: List[Tuple[int, int, str]]) -> TestResult:
+    """Chấm điểm 1 case từ kết quả gửi (2 lượt gửi với case `stable_status`)."""
+    if tc.expect.get("stable_status"):
+        (s1, t1, p1), (s2, t2, p2) = sends
+        ok = (s1 == s2) and (s1 != -1)
+        reason = f"status1={s1}, status2={s2}, kỳ vọng giống nhau"
+        status, elapsed_ms, preview = s2, t1 + t2, (p2 if p2 else p1) or ""
+    else:
+        status, elapsed_ms, preview = sends[0]
+        ok, reason = evaluate(tc.expect, status)
+    return TestResult(
+        name=tc.name,
+        description=tc.description,
+        method=tc.method,
+        url=tc.url,
+        request_headers=mask_sensitive(tc.headers),
+        request_body=tc.body,
+        status_code=status,
+        elapsed_ms=elapsed_ms,
+        ok=ok,
+        reason=reason,
+        response_preview=preview,
+    )
+
+
 def download_test_script(url: str, dest_dir: str = ".", filename: Optional[str] = None,
                          token: Optional[str] = None) -> Tuple[str, str]:
     """Tải script kiểm thử và ghi hướng dẫn chạy local.
@@ -494,161 +711,211 @@ def download_test_script(url: str, dest_dir: str = ".", filename: Optional[str]
     return script_path, instruction_path
 
 
-def run_cases(curl_cmd: str, out_prefix: Optional[str] = None, serve_mode: bool = False,
-              timeout: int = DEFAULT_TIMEOUT, auth_token: Optional[str] = None) -> Dict[str, Any]:
-    pc = parse_curl(curl_cmd)
+async def _iter_all(cases: Iterable[TestCase], verify_ssl: bool, timeout: int, token: Optional[str],
+                    denied: List[int]) -> AsyncIterator[Tuple[int, TestResult]]:
+    """Gửi đồng thời mọi case qua 1 ClientSession; yield (vị trí case, kết quả) theo thứ tự xong trước.
+
+    Case nhận 401/403 được ghi vào `denied` (bên gọi xoá cache token khi cả lượt xong)."""
+    sem = asyncio.Semaphore(DEFAULT_CONCURRENCY)
+    # Chờ slot theo host trước khi bấm giờ → elapsed_ms không tính thời gian xếp hàng trong pool
+    host_sems: Dict[str, asyncio.Semaphore] = {}
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=DEFAULT_PER_HOST, keepalive_timeout=30,
+                                     ssl=ssl.create_default_context() if verify_ssl else False)
+    # DummyCookieJar: không mang cookie từ case này sang case khác (giống requests.request)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar(),
+                                     skip_auto_headers=("Content-Type",), trust_env=True) as session:
+        async def _one(i: int, tc: TestCase) -> Tuple[int, TestResult]:
+            host_sem = host_sems.setdefault(urlsplit(tc.url).netloc, asyncio.Semaphore(DEFAULT_PER_HOST))
+            headers = _with_auth(tc.headers or {}, token)
+            async with sem, host_sem:
+                sends = [await _send_async(session, tc, headers, timeout)]
+                if tc.expect.get("stable_status"):
+                    # gửi lần 2 sau khi lần 1 xong (vẫn song song với các case khác)
+                    sends.append(await _send_async(session, tc, headers, timeout))
+            if any(status in (401, 403) for status, _, _ in sends):
+                denied.append(i)
+            return i, _build_result(tc, sends)
+
+        tasks = [asyncio.create_task(_one(i, tc)) for i, tc in enumerate(cases)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            # bên nhận dừng giữa chừng (vd. client ngắt stream) → huỷ các case còn đang chạy
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _iter_results(pc: ParsedCurl, cases: Iterable[TestCase],
+                        timeout: int) -> AsyncIterator[Tuple[int, TestResult]]:
+    """Yield (vị trí case, kết quả) ngay khi từng case chạy xong.
+
+    Token Authorization được chụp 1 lần trước khi gửi: case chạy song song không đọc/ghi
+    cache giữa chừng → case nào mang token không phụ thuộc case nào trả 401/403 trước.
+    Có 401/403 thì xoá cache sau khi cả lượt chạy xong."""
+    token = _AUTH_TOKEN_CACHE
+    denied: List[int] = []
+    if aiohttp is not None:
+        inner = _iter_all(cases, pc.verify_ssl, timeout, token, denied)
+        try:
+            async for item in inner:
+                yield item
+        finally:
+            # bị đóng giữa chừng → đóng luôn generator con (huỷ case, đóng session) ngay tại đây,
+            # không để finalizer của GC chạy sau khi event loop đã đóng
+            await inner.aclose()
+    else:
+        # requests là blocking → chạy trong thread để không chặn event loop
+        for i, tc in enumerate(cases):
+            headers = _with_auth(tc.headers or {}, token)
+            rounds = 2 if tc.expect.get("stable_status") else 1
+            sends = [await asyncio.to_thread(_send_sync, tc.method, tc.url, headers, tc.body,
+                                             pc.verify_ssl, timeout)
+                     for _ in range(rounds)]
+            if any(status in (401, 403) for status, _, _ in sends):
+                denied.append(i)
+            yield i, _build_result(tc, sends)
+    if denied:
+        _clear_auth_token()
+
+
+def _prepare_run(curl_cmd: str, auth_token: Optional[str]) -> Tuple[ParsedCurl, Tuple[TestCase, ...]]:
+    """Parse + sinh case và nạp token (raise ValueError nếu cURL không hợp lệ)."""
+    pc, cases = _parse_and_generate(curl_cmd)
     if auth_token:
         _apply_auth_token({"Authorization": auth_token})
     else:
         _apply_auth_token(pc.headers)
-    cases = generate_testcases(pc)
-
-    results: List[TestResult] = []
+    return pc, cases
 
-    for tc in cases:
-        if tc.expect.get("stable_status"):
-            s1, t1, p1 = send_request(tc.method, tc.url, tc.headers, tc.body, pc.verify_ssl, timeout)
-            s2, t2, p2 = send_request(tc.method, tc.url, tc.headers, tc.body, pc.verify_ssl, timeout)
-            ok = (s1 == s2) and (s1 != -1)
-            reason = f"status1={s1}, status2={s2}, kỳ vọng giống nhau"
-            results.append(TestResult(
-                name=tc.name,
-                description=tc.description,
-                method=tc.method,
-                url=tc.url,
-                request_headers=mask_sensitive(tc.headers),
-                request_body=tc.body,
-                status_code=s2,
-                elapsed_ms=t1 + t2,
-                ok=ok,
-                reason=reason,
-                response_preview=(p2 if p2 else p1) or "",
-            ))
-            continue
 
-        status, elapsed_ms, preview = send_request(tc.method, tc.url, tc.headers, tc.body, pc.verify_ssl, timeout)
-        ok, reason = evaluate(tc.expect, status)
-        results.append(TestResult(
-            name=tc.name,
-            description=tc.description,
-            method=tc.method,
-            url=tc.url,
-            request_headers=mask_sensitive(tc.headers),
-            request_body=tc.body,
-            status_code=status,
-            elapsed_ms=elapsed_ms,
-            ok=ok,
-            reason=reason,
-            response_preview=preview,
-        ))
-
-    summary = {
+def _summarize(results: List[TestResult], start_ns: int) -> Dict[str, Any]:
+    """`duration_ms` là thời gian thực của cả lượt chạy (tính từ `start_ns`, perf_counter_ns);
+    case chạy song song nên tổng elapsed_ms từng case để riêng ở `elapsed_sum_ms`."""
+    return {
         "total": len(results),
         "passed": sum(1 for r in results if r.ok),
         "failed": sum(1 for r in results if not r.ok),
-        "duration_ms": sum(r.elapsed_ms or 0 for r in results),
+        "duration_ms": (time.perf_counter_ns() - start_ns) // 1_000_000,
+        "elapsed_sum_ms": sum(r.elapsed_ms or 0 for r in results),
     }
 
+
+async def run_cases_async(curl_cmd: str, out_prefix: Optional[str] = None, serve_mode: bool = False,
+                          timeout: int = DEFAULT_TIMEOUT, auth_token: Optional[str] = None) -> Dict[str, Any]:
+    pc, cases = _prepare_run(curl_cmd, auth_token)
+    start = time.perf_counter_ns()
+    done = [item async for item in _iter_results(pc, cases, timeout)]
+    results = [r for _, r in sorted(done, key=lambda item: item[0])]
+
     output = {
-        "summary": summary,
-        "parsed": dataclasses.asdict(pc),
-        "results": [dataclasses.asdict(r) for r in results],
+        "summary": _summarize(results, start),
+        "parsed": pc.to_dict(),
+        "results": [r._asdict() for r in results],
     }
 
     if out_prefix and not serve_mode:
-        with open(out_prefix + ".json", "w", encoding="utf-8") as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
-        with open(out_prefix + ".md", "w", encoding="utf-8") as f:
-            f.write(render_markdown_report(output))
-        with open(out_prefix + ".html", "w", encoding="utf-8") as f:
-            f.write(render_html_report(output))
+        # render + ghi 3 file trong thread pool: I/O đĩa của các file chồng lên nhau
+        await asyncio.gather(
+            asyncio.to_thread(_write_report, out_prefix + ".json", _render_json_report, output),
+            asyncio.to_thread(_write_report, out_prefix + ".md", render_markdown_report, output),
+            asyncio.to_thread(_write_report, out_prefix + ".html", render_html_report, output),
+        )
 
     return output
 
 
+def run_cases(curl_cmd: str, out_prefix: Optional[str] = None, serve_mode: bool = False,
+              timeout: int = DEFAULT_TIMEOUT, auth_token: Optional[str] = None) -> Dict[str, Any]:
+    """Bản đồng bộ của `run_cases_async` (dùng cho CLI)."""
+    return asyncio.run(run_cases_async(curl_cmd, out_prefix=out_prefix, serve_mode=serve_mode,
+                                       timeout=timeout, auth_token=auth_token))
+
+
+def _ndjson_line(obj: Dict[str, Any]) -> bytes:
+    return _json_dumps(obj).encode("utf-8") + b"\n"
+
+
+def stream_results_ndjson(pc: ParsedCurl, cases: Iterable[TestCase], timeout: int) -> Iterator[bytes]:
+    """Chạy case trên event loop riêng, yield 1 dòng NDJSON ngay khi mỗi case xong.
+
+    Dòng `{"type": "result", "index": i, ...}` cho từng case (theo thứ tự xong trước),
+    dòng cuối `{"type": "summary", ...}`. Dùng cho /run (generator đồng bộ của WSGI)."""
+    loop = asyncio.new_event_loop()
+    agen = _iter_results(pc, cases, timeout)
+    results: List[TestResult] = []
+    start = time.perf_counter_ns()
+    try:
+        while True:
+            try:
+                i, r = loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+            results.append(r)
+            yield _ndjson_line({"type": "result", "index": i, **r._asdict()})
+        yield _ndjson_line({"type": "summary", "summary": _summarize(results, start), "parsed": pc.to_dict()})
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+
 # --------------------------
 # Render báo cáo
 # --------------------------
 
+def _write_report(path: str, render: Callable[[Dict[str, Any]], str], data: Dict[str, Any]) -> None:
+    content = render(data)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _render_json_report(data: Dict[str, Any]) -> str:
+    return _json_dumps(data, indent=True)
+
+
 def render_markdown_report(data: Dict[str, Any]) -> str:
     s = data["summary"]
-    lines = []
-    lines.append("# API Test Report")
-    lines.append("")
-    lines.append(f"Tổng: **{s['total']}** · PASS: **{s['passed']}** · FAIL: **{s['failed']}** · Thời gian: **{s['duration_ms']} ms**")
-    lines.append("")
-    lines.append("| Case | Trạng thái | Status | Thời gian (ms) | Ghi chú |")
-    lines.append("|---|---|---:|---:|---|")
+    _jd = json.dumps
+    buf = io.StringIO()
+    w = buf.write
+    w("# API Test Report\n\n")
+    w(f"Tổng: **{s['total']}** · PASS: **{s['passed']}** · FAIL: **{s['failed']}** · Thời gian: **{s['duration_ms']} ms**\n\n")
+    w("| Case | Trạng thái | Status | Thời gian (ms) | Ghi chú |\n")
+    w("|---|---|---:|---:|---|")
     for r in data["results"]:
         badge = "✅ PASS" if r["ok"] else "❌ FAIL"
-        lines.append(f"| `{r['name']}` | {badge} | {r['status_code']} | {r['elapsed_ms']} | {r['reason']} |")
-    lines.append("")
-    lines.append("## Chi tiết")
+        w(f"\n| `{r['name']}` | {badge} | {r['status_code']} | {r['elapsed_ms']} | {r['reason']} |")
+    w("\n\n## Chi tiết")
     for r in data["results"]:
-        lines.append(f"### {r['name']}")
-        lines.append(r.get("description", ""))
-        lines.append("")
-        lines.append("**Request**:")
-        lines.append("")
-        lines.append(f"- Method: `{r['method']}`")
-        lines.append(f"- URL: `{r['url']}`")
-        lines.append(f"- Headers: `{json.dumps(r['request_headers'], ensure_ascii=False)}`")
+        w(f"\n### {r['name']}\n{r.get('description', '')}\n\n**Request**:\n\n"
+          f"- Method: `{r['method']}`\n"
+          f"- URL: `{r['url']}`\n"
+          f"- Headers: `{_jd(r['request_headers'], ensure_ascii=False)}`")
         if r.get("request_body") is not None:
             body_pre = r['request_body']
             if isinstance(body_pre, str) and len(body_pre) > 800:
                 body_pre = body_pre[:800] + "..."
-            lines.append(f"- Body: `{body_pre}`")
-        lines.append("")
-        lines.append("**Response**:")
-        lines.append("")
-        lines.append(f"- Status: `{r['status_code']}`")
-        lines.append(f"- Time: `{r['elapsed_ms']} ms`")
-        resp_pre = r.get("response_preview") or ""
-        resp_pre = resp_pre.replace("`", "\`")
-        lines.append("")
-        lines.append("```\n" + resp_pre + "\n```")
-        lines.append("")
-    return "\n".join(lines)
+            w(f"\n- Body: `{body_pre}`")
+        resp_pre = (r.get("response_preview") or "").replace("`", "\\`")
+        w(f"\n\n**Response**:\n\n"
+          f"- Status: `{r['status_code']}`\n"
+          f"- Time: `{r['elapsed_ms']} ms`\n\n"
+          f"```\n{resp_pre}\n```\n")
+    return buf.getvalue()
 
 
 def render_html_report(data: Dict[str, Any]) -> str:
     s = data["summary"]
-    rows = []
-    for r in data["results"]:
-        badge = ("<span style='color:#0a0'>PASS</span>" if r["ok"] else "<span style='color:#c00'>FAIL</span>")
-        rows.append(
-            f"<tr><td><code>{html.escape(r['name'])}</code></td>"
-            f"<td>{badge}</td>"
-            f"<td style='text-align:right'>{r['status_code']}</td>"
-            f"<td style='text-align:right'>{r['elapsed_ms']}</td>"
-            f"<td>{html.escape(r['reason'])}</td></tr>"
-        )
-
-    detail_blocks = []
-    for r in data["results"]:
-        resp_pre = html.escape(r.get("response_preview") or "")
-        req_body = r.get("request_body")
-        if isinstance(req_body, str) and len(req_body) > 800:
-            req_body = req_body[:800] + "..."
-        req_body = req_body or ""
-        detail_blocks.append(f"""
-        <section style='margin:16px 0;padding:12px;border:1px solid #eee;border-radius:10px'>
-          <h3 style='margin:0 0 8px 0'>{html.escape(r['name'])}</h3>
-          <p style='margin:0 0 6px 0;color:#555'>{html.escape(r.get('description',''))}</p>
-          <div><b>Request</b></div>
-          <div>Method: <code>{html.escape(r['method'])}</code></div>
-          <div>URL: <code>{html.escape(r['url'])}</code></div>
-          <div>Headers: <code>{html.escape(json.dumps(r['request_headers'], ensure_ascii=False))}</code></div>
-          {f"<div>Body: <code>{html.escape(req_body)}</code></div>" if req_body is not None else ""}
-          <div style='height:8px'></div>
-          <div><b>Response</b></div>
-          <div>Status: <code>{r['status_code']}</code></div>
-          <div>Time: <code>{r['elapsed_ms']} ms</code></div>
-          <pre style='white-space:pre-wrap;background:#fafafa;border:1px solid #eee;padding:10px;border-radius:8px;max-height:400px;overflow:auto'>{resp_pre}</pre>
-        </section>
-        """)
-
-    return f"""
+    # Mọi giá trị escape đều nằm trong nội dung thẻ (không trong thuộc tính) → không cần
+    # escape dấu nháy: quote=False chỉ quét & < > (3 lượt replace thay vì 5)
+    _esc = html.escape
+    _jd = json.dumps
+    buf = io.StringIO()
+    w = buf.write
+    w(f"""
 <!doctype html>
 <html lang=\"vi\"> 
 <head>
@@ -671,294 +938,237 @@ def render_html_report(data: Dict[str, Any]) -> str:
       <tr><th>Case</th><th>Trạng thái</th><th style='text-align:right'>Status</th><th style='text-align:right'>Thời gian (ms)</th><th>Ghi chú</th></tr>
     </thead>
     <tbody>
-      {''.join(rows)}
+      """)
+    for r in data["results"]:
+        badge = ("<span style='color:#0a0'>PASS</span>" if r["ok"] else "<span style='color:#c00'>FAIL</span>")
+        w(f"<tr><td><code>{_esc(r['name'], False)}</code></td>"
+          f"<td>{badge}</td>"
+          f"<td style='text-align:right'>{r['status_code']}</td>"
+          f"<td style='text-align:right'>{r['elapsed_ms']}</td>"
+          f"<td>{_esc(r['reason'], False)}</td></tr>")
+    w("""
     </tbody>
   </table>
 
   <h2>Chi tiết</h2>
-  {''.join(detail_blocks)}
+  """)
+    for r in data["results"]:
+        resp_pre = _esc(r.get("response_preview") or "", False)
+        req_body = r.get("request_body")
+        if isinstance(req_body, str) and len(req_body) > 800:
+            req_body = req_body[:800] + "..."
+        req_body = req_body or ""
+        w(f"""
+        <section style='margin:16px 0;padding:12px;border:1px solid #eee;border-radius:10px'>
+          <h3 style='margin:0 0 8px 0'>{_esc(r['name'], False)}</h3>
+          <p style='margin:0 0 6px 0;color:#555'>{_esc(r.get('description',''), False)}</p>
+          <div><b>Request</b></div>
+          <div>Method: <code>{_esc(r['method'], False)}</code></div>
+          <div>URL: <code>{_esc(r['url'], False)}</code></div>
+          <div>Headers: <code>{_esc(_jd(r['request_headers'], ensure_ascii=False), False)}</code></div>
+          <div>Body: <code>{_esc(req_body, False)}</code></div>
+          <div style='height:8px'></div>
+          <div><b>Response</b></div>
+          <div>Status: <code>{r['status_code']}</code></div>
+          <div>Time: <code>{r['elapsed_ms']} ms</code></div>
+          <pre style='white-space:pre-wrap;background:#fafafa;border:1px solid #eee;padding:10px;border-radius:8px;max-height:400px;overflow:auto'>{resp_pre}</pre>
+        </section>
+        """)
+    w("""
 </body>
 </html>
-"""
+""")
+    return buf.getvalue()
 
 
 # --------------------------
 # Chọn host/port khả dụng & chạy UI (tránh SystemExit:1)
 # --------------------------
 
-def _port_free(host: str, port: int) -> bool:
+def _listen(host: str, port: int) -> socket.socket:
+    """Bind + listen sẵn socket cho UI, raise OSError nếu không bind được.
+
+    Socket này được giao thẳng cho werkzeug (`_serve`), nên không còn khe hở
+    giữa lúc kiểm tra port rảnh và lúc server bind lại."""
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
-        # Không dùng SO_REUSEADDR vì một số môi trường không có hằng số này
+        # Cho phép bind lại port còn TIME_WAIT khi restart (như werkzeug);
+        # bỏ qua trên Windows (ở đó SO_REUSEADDR cho phép chiếm port đang dùng)
+        if os.name != "nt" and hasattr(socket, "SO_REUSEADDR"):
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         s.bind((host, port))
-        return True
-    except OSError as e:
-        # EADDRINUSE (98/48) hoặc EACCES (13)
-        if isinstance(e, OSError) and e.errno in (getattr(errno, 'EADDRINUSE', 98), getattr(errno, 'EACCES', 13)):
-            return False
-        return False
+        s.listen(128)
+    except OSError:
+        s.close()
+        raise
+    return s
+
+
+def _serve(app, sock: socket.socket) -> None:
+    """Chạy UI trên socket đã bind sẵn (blocking tới khi dừng).
+
+    Ưu tiên waitress (pool thread, /run chậm không chặn các request khác),
+    không có thì dùng server của werkzeug."""
+    if waitress is not None:
+        waitress.serve(app, sockets=[sock], threads=UI_THREADS)
+        return
+
+    from werkzeug.serving import make_server
+
+    host, port = sock.getsockname()[:2]
+    srv = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    sock.close()  # werkzeug đã giữ bản sao fd
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
     finally:
+        srv.server_close()
+
+
+def _ui_candidates(host: str, start: int, attempts: int = 20) -> List[Tuple[str, int]]:
+    """Danh sách (host, port) theo thứ tự ưu tiên: mỗi host quét port start..start+attempts,
+    cuối cùng là port 0 (OS chọn ngẫu nhiên). Host trùng chỉ thử 1 lần."""
+    hosts = dict.fromkeys([host or DEFAULT_HOST, DEFAULT_HOST, "127.0.0.1", "localhost"])
+    ports = list(range(start, start + attempts + 1)) if start > 0 else []
+    ports.append(0)
+    return [(h, p) for h in hosts for p in ports]
+
+
+def _bind_first(candidates: Iterable[Tuple[str, int]]) -> Optional[socket.socket]:
+    """Trả socket đã listen ở (host, port) đầu tiên bind được; None nếu không có."""
+    for h, p in candidates:
         try:
-            s.close()
-        except Exception:
-                pass
+            return _listen(h, p)
+        except OSError:
+            continue
+    return None
 
 
-def _pick_port(host: str, preferred: int, attempts: int = 20) -> int:
-    if preferred and preferred > 0 and _port_free(host, preferred):
-        return preferred
-    base = preferred if preferred and preferred > 0 else DEFAULT_PORT
-    for i in range(1, attempts + 1):
-        cand = base + i
-        if _port_free(host, cand):
-            return cand
-    return 0  # 0 = OS chọn ngẫu nhiên
+# Trang UI nằm ở static/index.html; chỉ đọc khi chạy UI (CLI không cần thư mục static/)
+STATIC_DIR = Path(__file__).resolve().parent / "static"
 
 
-def run_ui(host: str, port: int):
-    from flask import Flask, request, jsonify, send_file
+class _IndexPage(NamedTuple):
+    body: bytes
+    length: str
+    gz: bytes
+    gz_length: str
+    etag: str
 
-    app = Flask(__name__)
 
-    INDEX_HTML = """
-<!doctype html>
-<html lang=\"vi\"> 
-<head>
-  <meta charset=\"utf-8\" />
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-  <title>API Tester</title>
-  <style>
-    :root {
-      --bg: #ffffff;
-      --fg: #111111;
-      --muted: #6b7280;
-      --card: #ffffff;
-      --border: #e5e7eb;
-      --accent: #2563eb;
-      --ok: #16a34a;
-      --ng: #dc2626;
-      --codebg: #f3f4f6;
-      --shadow: 0 2px 10px rgba(0,0,0,.06);
-    }
-    :root[data-theme="dark"] {
-      --bg: #0b0f19;
-      --fg: #e5e7eb;
-      --muted: #9ca3af;
-      --card: #111827;
-      --border: #1f2937;
-      --accent: #60a5fa;
-      --ok: #22c55e;
-      --ng: #f87171;
-      --codebg: #0f172a;
-      --shadow: 0 2px 10px rgba(0,0,0,.3);
-    }
+def _load_index_page() -> _IndexPage:
+    """Đọc trang UI 1 lần, tính sẵn bản gzip và ETag; GET / trả thẳng các bytes này."""
+    body = (STATIC_DIR / "index.html").read_bytes()
+    # mtime=0 → bytes gzip cố định giữa các lần khởi động
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    # ETag theo nội dung: trình duyệt revalidate nhận 304, không tải lại trang
+    etag = hashlib.sha1(body).hexdigest()[:16]
+    return _IndexPage(body, str(len(body)), gz, str(len(gz)), etag)
 
-    * { box-sizing: border-box }
-    body { font-family: system-ui,-apple-system,Segoe UI,Roboto,Ubuntu,Helvetica,Arial,sans-serif; margin: 24px; background: var(--bg); color: var(--fg); }
-    textarea { width: 100%; min-height: 140px; font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, \"Liberation Mono\", \"Courier New\", monospace; background: var(--card); color: var(--fg); border: 1px solid var(--border); border-radius: 12px; padding: 12px; box-shadow: var(--shadow); }
-    .row { display:flex; gap:12px; align-items:center; flex-wrap:wrap; }
-    .btn { padding: 10px 16px; border-radius: 12px; border: 1px solid var(--border); background: var(--fg); color: var(--bg); cursor: pointer; font-weight:600; box-shadow: var(--shadow); }
-    .btn[disabled] { opacity:.6; cursor: not-allowed; }
-    .btn-secondary { background: transparent; color: var(--fg); }
-    .panel { border: 1px solid var(--border); border-radius: 12px; padding: 16px; margin-top: 16px; background: var(--card); box-shadow: var(--shadow); }
-    table { border-collapse: collapse; width: 100%; margin-top: 10px; }
-    th, td { border-bottom: 1px solid var(--border); padding: 8px 10px; text-align: left; }
-    th { background: color-mix(in oklab, var(--card), var(--fg) 5%); }
-    code { background: var(--codebg); padding: 2px 6px; border-radius: 6px; }
-    .ok { color: var(--ok) }
-    .ng { color: var(--ng) }
-
-    /* Loading bar */
-    .loading { display:none; margin-top:12px; }
-    .progress-wrap { height: 10px; width: 100%; background: var(--border); border-radius: 999px; overflow: hidden; }
-    .progress-bar { height: 100%; width: 40%; background: var(--accent); border-radius: 999px; animation: indet 1.2s infinite; }
-    @keyframes indet { 0% { transform: translateX(-100%); } 50% { transform: translateX(20%); } 100% { transform: translateX(100%); } }
-    .loading-text { color: var(--muted); font-size: 14px; margin-top: 6px; display:flex; align-items:center; gap:8px; }
-    .dot { width:6px; height:6px; border-radius:999px; background: var(--accent); animation: blink 1s infinite alternate; }
-    @keyframes blink { from { opacity:.3 } to { opacity:1 } }
-
-    .header { display:flex; align-items:center; justify-content:space-between; gap:12px; margin-bottom: 8px; }
-    .title { display:flex; align-items:center; gap:10px; }
-    .title .badge { font-size:12px; padding:2px 8px; background: var(--codebg); border-radius:999px; color: var(--muted); border:1px solid var(--border); }
-  </style>
-</head>
-<body>
-  <div class=\"header\">
-    <div class=\"title\">
-      <h1 style=\"margin:0\">API Tester</h1>
-      <span class=\"badge\">cURL → Test cases → Report</span>
-    </div>
-    <button id=\"themeBtn\" class=\"btn btn-secondary\" title=\"Chuyển giao diện sáng/tối\">🌙 Dark</button>
-  </div>
-
-  <p>Dán lệnh <code>curl</code> (đầy đủ method, headers, body, URL) rồi bấm <b>Chạy test</b>.</p>
-  <textarea id=\"curl\" placeholder=\"curl -X POST https://api.example.com/v1/things -H 'Authorization: Bearer xxxxx' -H 'Content-Type: application/json' -d '{\\"name\\":\\"abc\\"}'\"></textarea>
-  <div class=\"row\" style=\"margin-top:8px\">
-    <input id=\"token\" type=\"text\" placeholder=\"Authorization token (optional)\" style=\"flex:1;padding:10px;border:1px solid var(--border);border-radius:12px;background:var(--card);color:var(--fg);\" />
-    <input id=\"dlUrl\" type=\"text\" placeholder=\"URL script kiểm thử\" style=\"flex:1;padding:10px;border:1px solid var(--border);border-radius:12px;background:var(--card);color:var(--fg);\" />
-    <button id=\"dlBtn\" class=\"btn btn-secondary\" onclick=\"downloadScript()\">Tải script</button>
-  </div>
-  <div class=\"row\" style=\"margin-top:8px\">
-    <button id=\"runBtn\" class=\"btn\" onclick=\"run()\">Chạy test</button>
-    <small id=\"hint\" style=\"color:var(--muted)\">Mẹo: bạn có thể dán trực tiếp cả lệnh <code>curl</code>.</small>
-  </div>
-
-  <div id=\"loading\" class=\"loading\">
-    <div class=\"progress-wrap\"><div class=\"progress-bar\"></div></div>
-    <div class=\"loading-text\"><span class=\"dot\"></span> Đang chạy test… vui lòng đợi.</div>
-  </div>
-
-  <div id=\"result\" class=\"panel\" style=\"display:none\"></div>
-
-<script>
-(function initTheme(){
-  const root = document.documentElement;
-  const saved = localStorage.getItem('api_tester_theme');
-  const prefersDark = window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches;
-  const theme = saved || (prefersDark ? 'dark' : 'light');
-  root.setAttribute('data-theme', theme);
-  document.getElementById('themeBtn').textContent = theme==='dark' ? '☀️ Light' : '🌙 Dark';
-})();
-
-document.getElementById('themeBtn').addEventListener('click', ()=>{
-  const root = document.documentElement;
-  const cur = root.getAttribute('data-theme') || 'light';
-  const next = cur === 'light' ? 'dark' : 'light';
-  root.setAttribute('data-theme', next);
-  localStorage.setItem('api_tester_theme', next);
-  document.getElementById('themeBtn').textContent = next==='dark' ? '☀️ Light' : '🌙 Dark';
-});
-
-async function run(){
-  const runBtn = document.getElementById('runBtn');
-  const loader = document.getElementById('loading');
-  const el = document.getElementById('result');
-  const curl = document.getElementById('curl').value;
-  const token = document.getElementById('token').value;
-
-  // UI state
-  runBtn.disabled = true;
-  loader.style.display = 'block';
-  el.style.display = 'none';
-  el.innerHTML = '';
-
-  try{
-    const res = await fetch('/run', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({curl, timeout: 30, token})});
-    const data = await res.json();
-
-    if (data.error){
-      el.style.display = 'block';
-      el.innerHTML = `<div style='color:var(--ng)'><b>Lỗi:</b> ${escapeHtml(data.error)}</div>`;
-      return;
-    }
+# Cache kết quả /run theo (curl, timeout, token): bấm "Chạy" lặp lại trong vài giây
+# trả lại bytes đã serialize, không gửi lại toàn bộ request tới API
+_RUN_TTL = 5.0
+_RUN_CACHE_MAX = 32
+_RUN_CACHE: Dict[Tuple[str, int, Optional[str]], Tuple[float, bytes]] = {}
+_RUN_CACHE_LOCK = threading.Lock()
 
-    const s = data.summary;
-    let html = `<h2 style='margin-top:0'>Kết quả</h2>`+
-      `<p>Tổng: <b>${s.total}</b> · PASS: <b class='ok'>${s.passed}</b> · FAIL: <b class='ng'>${s.failed}</b> · Thời gian: <b>${s.duration_ms} ms</b></p>`;
-    html += `<table><thead><tr><th>Case</th><th>Trạng thái</th><th style='text-align:right'>Status</th><th style='text-align:right'>Time (ms)</th><th>Ghi chú</th></tr></thead><tbody>`;
-    for (const r of data.results){
-      html += `<tr><td><code>${r.name}</code></td><td>${r.ok?'<span class=ok>PASS</span>':'<span class=ng>FAIL</span>'}</td><td style='text-align:right'>${r.status_code}</td><td style='text-align:right'>${r.elapsed_ms}</td><td>${r.reason}</td></tr>`;
-    }
-    html += `</tbody></table>`;
-    html += `<details style='margin-top:12px'><summary>Chi tiết</summary>`;
-    for (const r of data.results){
-      html += `<section style='margin:12px 0;padding:12px;border:1px solid var(--border);border-radius:10px;background:var(--card)'>`
-              + `<h3 style='margin:0 0 8px 0'>${r.name}</h3>`
-              + `<div><b>Request</b></div>`
-              + `<div>Method: <code>${r.method}</code></div>`
-              + `<div>URL: <code>${r.url}</code></div>`
-              + `<div>Headers: <code>${escapeHtml(JSON.stringify(r.request_headers))}</code></div>`
-              + (r.request_body!==null && r.request_body!==undefined ? `<div>Body: <code>${escapeHtml(r.request_body)}</code></div>`:'' )
-              + `<div style='height:8px'></div>`
-              + `<div><b>Response</b></div>`
-              + `<div>Status: <code>${r.status_code}</code></div>`
-              + `<div>Time: <code>${r.elapsed_ms} ms</code></div>`
-              + `<pre style='white-space:pre-wrap;background:var(--codebg);border:1px solid var(--border);padding:10px;border-radius:8px;max-height:400px;overflow:auto'>${escapeHtml(r.response_preview||'')}</pre>`
-              + `</section>`;
-    }
-    html += `</details>`;
-
-    el.innerHTML = html;
-    el.style.display = 'block';
-  } catch(err){
-    el.style.display = 'block';
-    el.innerHTML = `<div style='color:var(--ng)'><b>Lỗi:</b> ${escapeHtml(String(err))}</div>`;
-  } finally {
-    // Restore UI state
-    loader.style.display = 'none';
-    runBtn.disabled = false;
-  }
-}
+# Body JSON cố định của UI (lỗi thiếu trường, /health): serialize 1 lần lúc import
+_ERR_MISSING_CURL = _json_dumps({"error": "Thiếu trường 'curl' trong payload."}).encode("utf-8")
+_ERR_MISSING_URL = _json_dumps({"error": "Thiếu trường 'url'."}).encode("utf-8")
+_HEALTH_BODY = b'{"ok":true}'
 
-async function downloadScript(){
-  const url = document.getElementById('dlUrl').value;
-  const token = document.getElementById('token').value;
-  if(!url){
-    alert('Vui lòng nhập URL script');
-    return;
-  }
-  try{
-    const res = await fetch('/download', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({url, token})});
-    if(!res.ok){
-      alert('Tải script thất bại');
-      return;
-    }
-    const blob = await res.blob();
-    const a = document.createElement('a');
-    a.href = URL.createObjectURL(blob);
-    a.download = 'api_test_script.zip';
-    document.body.appendChild(a);
-    a.click();
-    a.remove();
-  }catch(err){
-    alert('Lỗi: ' + err);
-  }
-}
 
-function escapeHtml(unsafe){
-  return String(unsafe)
-    .replaceAll('&','&amp;')
-    .replaceAll('<','&lt;')
-    .replaceAll('>','&gt;')
-    .replaceAll('"','&quot;')
-    .replaceAll("'",'&#039;');
-}
-</script>
-</body>
-</html>
-"""
+def _run_cache_get(key: Tuple[str, int, Optional[str]]) -> Optional[bytes]:
+    with _RUN_CACHE_LOCK:
+        hit = _RUN_CACHE.get(key)
+    if hit and time.monotonic() - hit[0] < _RUN_TTL:
+        return hit[1]
+    return None
+
+
+def _run_cache_put(key: Tuple[str, int, Optional[str]], body: bytes) -> None:
+    with _RUN_CACHE_LOCK:
+        _RUN_CACHE.pop(key, None)
+        while len(_RUN_CACHE) >= _RUN_CACHE_MAX:
+            del _RUN_CACHE[next(iter(_RUN_CACHE))]  # FIFO: bỏ entry cũ nhất
+        _RUN_CACHE[key] = (time.monotonic(), body)
+
+
+def create_app(page: Optional[_IndexPage] = None):
+    """Dựng Flask app của UI (raise OSError nếu không đọc được static/index.html)."""
+    from flask import Flask, Response, request, send_file
+
+    if page is None:
+        page = _load_index_page()
+
+    app = Flask(__name__)
+
+    def _json_response(obj: Any, status: int = 200) -> Response:
+        # _json_dumps: orjson nếu có, không qua encoder stdlib của jsonify
+        return Response(_json_dumps(obj), status=status, mimetype="application/json")
 
     @app.get("/")
     def index():
-        return INDEX_HTML
+        headers = {"Cache-Control": "public, max-age=3600", "Vary": "Accept-Encoding"}
+        gzipped = bool(request.accept_encodings["gzip"])
+        if gzipped:
+            body = page.gz
+            headers["Content-Encoding"] = "gzip"
+            headers["Content-Length"] = page.gz_length
+        else:
+            body = page.body
+            headers["Content-Length"] = page.length
+        resp = Response(body, content_type="text/html; charset=utf-8", headers=headers)
+        # 2 bản (gzip/thường) là 2 representation khác nhau → ETag khác nhau
+        resp.set_etag(page.etag + ("-gz" if gzipped else ""))
+        return resp.make_conditional(request)
 
     @app.get("/health")
     def health():
-        return {"ok": True}
+        return Response(_HEALTH_BODY, mimetype="application/json")
 
     @app.post("/run")
     def run():
-        from flask import request, jsonify
+        from flask import request
         payload = request.get_json(silent=True) or {}
         curl = payload.get("curl")
         timeout = int(payload.get("timeout") or DEFAULT_TIMEOUT)
         token = request.headers.get("Authorization") or payload.get("token")
         if not curl:
-            return jsonify({"error": "Thiếu trường 'curl' trong payload."}), 400
+            return Response(_ERR_MISSING_CURL, status=400, mimetype="application/json")
+        key = (curl.strip(), timeout, token)
+        body = _run_cache_get(key)
+        if body is not None:
+            return Response(body, mimetype="application/x-ndjson")
         try:
-            result = run_cases(curl, out_prefix=None, serve_mode=True, timeout=timeout, auth_token=token)
-            return jsonify(result)
-        except Exception as e:  # pragma: no cover
-            return jsonify({"error": str(e)}), 400
+            # parse trước khi stream để cURL lỗi vẫn trả 400 + JSON như cũ
+            pc, cases = _prepare_run(curl, token)
+        except Exception as e:
+            return _json_response({"error": str(e)}, 400)
+
+        def gen():
+            lines = []
+            try:
+                for line in stream_results_ndjson(pc, cases, timeout):
+                    lines.append(line)
+                    yield line
+            except Exception as e:  # pragma: no cover
+                # header 200 đã gửi → báo lỗi bằng 1 dòng NDJSON
+                yield _ndjson_line({"type": "error", "error": str(e)})
+                return
+            _run_cache_put(key, b"".join(lines))
+
+        return Response(gen(), mimetype="application/x-ndjson")
 
     @app.post("/download")
     def download():
-        from flask import request, jsonify
+        from flask import request
         payload = request.get_json(silent=True) or {}
         url = payload.get("url")
         token = payload.get("token")
         if not url:
-            return jsonify({"error": "Thiếu trường 'url'."}), 400
+            return Response(_ERR_MISSING_URL, status=400, mimetype="application/json")
         tmpdir = tempfile.mkdtemp()
         try:
             script_path, instr_path = download_test_script(url, dest_dir=tmpdir, token=token)
@@ -969,44 +1179,28 @@ function escapeHtml(unsafe){
             buf.seek(0)
             return send_file(buf, mimetype="application/zip", as_attachment=True, download_name="api_test_script.zip")
         except Exception as e:
-            return jsonify({"error": str(e)}), 400
+            return _json_response({"error": str(e)}, 400)
         finally:
             shutil.rmtree(tmpdir, ignore_errors=True)
 
-    # Thử nhiều host/port để tránh SystemExit:1 do bind thất bại
-    host_candidates = [host or DEFAULT_HOST, DEFAULT_HOST, "127.0.0.1", "localhost"]
-    tried_any = False
-    for bind_host in host_candidates:
-        chosen = _pick_port(bind_host, int(port) if port else DEFAULT_PORT)
-        attempts = 0
-        max_attempts = 20 if chosen != 0 else 1
-        while True:
-            tried_any = True
-            try:
-                print(f"[api_tester] UI chạy tại http://{bind_host}:{chosen if chosen!=0 else '<random>'}")
-                # use_reloader=False để tránh reloader làm exit(1) ở vài môi trường
-                app.run(host=bind_host, port=chosen, debug=False, use_reloader=False)
-                return  # server blocking; khi dừng mới thoát
-            except SystemExit as e:
-                code = getattr(e, 'code', 0)
-                if code == 0:
-                    return
-                attempts += 1
-                if attempts > max_attempts:
-                    sys.stderr.write(f"[api_tester] Không bind được {bind_host}:{chosen}.\n")
-                    break  # thử host tiếp theo
-                if chosen != 0:
-                    chosen += 1
-                    sys.stderr.write(f"[api_tester] Port bận, thử lại với {bind_host}:{chosen}...\n")
-                else:
-                    sys.stderr.write("[api_tester] Dùng port ngẫu nhiên vẫn lỗi — thử host khác.\n")
-                    break
-            except OSError as e:
-                sys.stderr.write(f"[api_tester] OSError khi chạy UI: {e}\n")
-                break
+    return app
+
+
+def run_ui(host: str, port: int):
+    try:
+        app = create_app()
+    except OSError as e:
+        sys.stderr.write(f"[api_tester] Không đọc được trang UI {STATIC_DIR / 'index.html'} ({e}).\n")
+        return
+
+    # Thử lần lượt các (host, port); tự bind socket rồi giao cho server (không dùng app.run)
+    sock = _bind_first(_ui_candidates(host, int(port) if port else DEFAULT_PORT))
+    if sock is not None:
+        bind_host, bind_port = sock.getsockname()[:2]
+        print(f"[api_tester] UI chạy tại http://{bind_host}:{bind_port}")
+        _serve(app, sock)
+        return  # server blocking; khi dừng mới thoát
 
-    if not tried_any:
-        sys.stderr.write("[api_tester] Không thử được host/port nào.\n")
     sys.stderr.write("[api_tester] Không thể khởi động UI sau nhiều lần thử. Hãy dùng CLI: \n"
                      "  python3 api_tester.py --curl \"curl -X GET https://httpbin.org/get\"\n")
     return  # thoát hài hòa, không raise
@@ -1050,13 +1244,10 @@ def main():
     # Hỗ trợ --curl dạng @file
     curl_cmd = args.curl
     if curl_cmd and curl_cmd.startswith("@"):
-        file_path = curl_cmd[1:]
-        with open(file_path, "r", encoding="utf-8") as f:
-            curl_cmd = f.read()
+        curl_cmd = Path(curl_cmd[1:]).read_text(encoding="utf-8")
 
     if not curl_cmd and args.curl_file:
-        with open(args.curl_file, "r", encoding="utf-8") as f:
-            curl_cmd = f.read()
+        curl_cmd = Path(args.curl_file).read_text(encoding="utf-8")
 
     if not curl_cmd:
         sys.stderr.write(
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""HTTP server cục bộ làm API đích cho test (chạy trong thread, không cần mạng ngoài)."""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = 0  # số request đã nhận (test cache dùng để biết có gọi lại API đích không)
+    _lock = threading.Lock()
+
+    def _reply(self):
+        with _Handler._lock:
+            _Handler.hits += 1
+        n = int(self.headers.get("Content-Length") or 0)
+        if n:
+            self.rfile.read(n)
+        code = 200 if self.headers.get("Authorization") else 401
+        out = json.dumps({"path": self.path, "method": self.command}).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # client đóng kết nối keep-alive (vd. khi session aiohttp đóng) → không in traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_target():
+    """Chạy server ở port ngẫu nhiên; trả (base_url, hàm dừng)."""
+    srv = _Server(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+    def stop():
+        srv.shutdown()
+        srv.server_close()
+
+    return f"http://127.0.0.1:{srv.server_address[1]}", stop
+
+
+def hits() -> int:
+    """Tổng số request server đích đã nhận."""
+    return _Handler.hits
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""_json_dumps phải cho cùng output dù có cài orjson hay không."""
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import api_tester  # noqa: E402
+
+SAMPLES = [
+    {},
+    {"name": "tiếng việt <b> & \"x\"", "age": 3, "ok": True, "none": None},
+    {"tags": ["x", 1, 2.5, -0.25, [], {}], "nested": {"a": {"b": [1, {"c": "d"}]}}},
+    {"nan": float("nan")},
+    {"values": [float("inf"), float("-inf"), 1.0]},
+    {"deep": [{"x": float("nan")}], "plain": "y"},
+    {"big": 2 ** 70, "name": "a"},
+    ["\u0001\t\n", " ", "😀"],
+]
+
+
+class JsonDumpsTest(unittest.TestCase):
+    def dump_both(self, obj, indent):
+        fast = api_tester._json_dumps(obj, indent=indent)
+        with mock.patch.object(api_tester, "orjson", None):
+            stdlib = api_tester._json_dumps(obj, indent=indent)
+        return fast, stdlib
+
+    @unittest.skipIf(api_tester.orjson is None, "cần orjson để so 2 nhánh")
+    def test_orjson_and_stdlib_paths_agree(self):
+        for obj in SAMPLES:
+            for indent in (False, True):
+                with self.subTest(obj=obj, indent=indent):
+                    fast, stdlib = self.dump_both(obj, indent)
+                    self.assertEqual(fast, stdlib)
+
+    def test_non_finite_floats_are_kept(self):
+        self.assertEqual(api_tester._json_dumps({"a": float("nan"), "b": [float("-inf")]}),
+                         '{"a":NaN,"b":[-Infinity]}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Kết quả `_parse_and_generate` được cache giữa các lượt chạy: sửa output không được lan sang lượt sau."""
+import unittest
+
+from _target import start_target
+
+import api_tester
+
+
+class ParseCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.base, cls.stop = start_target()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stop()
+
+    def curl(self):
+        return f"curl -X POST {self.base}/items/1 -H 'X-A: a' -H 'Content-Type: application/json' -d '{{\"name\": \"x\"}}'"
+
+    def test_cached_parse_is_read_only(self):
+        pc, cases = api_tester._parse_and_generate(self.curl())
+        with self.assertRaises(TypeError):
+            pc.headers["X-Poison"] = "1"
+        with self.assertRaises(TypeError):
+            cases[0].headers["X-Poison"] = "1"
+        with self.assertRaises(TypeError):
+            cases[0].expect["accept_any"] = False
+
+    def test_mutating_output_does_not_leak_into_next_run(self):
+        out = api_tester.run_cases(self.curl(), timeout=5)
+        out["parsed"]["headers"]["X-Poison"] = "1"
+        for r in out["results"]:
+            r["request_headers"]["X-Poison"] = "1"
+
+        again = api_tester.run_cases(self.curl(), timeout=5)
+        self.assertEqual(again["parsed"]["headers"], {"X-A": "a", "Content-Type": "application/json"})
+        for r in again["results"]:
+            self.assertNotIn("X-Poison", r["request_headers"], r["name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""_split_curl phải tách token giống hệt shlex.split (kể cả lỗi với nháy chưa đóng)."""
+import random
+import shlex
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from api_tester import _split_curl  # noqa: E402
+
+
+def _outcome(split, s):
+    try:
+        return "ok", split(s)
+    except ValueError as e:
+        return "error", type(e).__name__
+
+
+class SplitCurlTest(unittest.TestCase):
+    CASES = [
+        "",
+        "   ",
+        "curl https://api.example.com/v1/items",
+        "curl -X POST 'https://h/items?a=1&b=2' -H 'Content-Type: application/json'",
+        "curl -H \"Authorization: Bearer abc\" --data-raw '{\"name\": \"abc\"}' http://h/1",
+        "curl -d \"{\\\"a\\\": \\\"b\\\\c\\\"}\" http://h",
+        "curl -H \"X: \\$HOME \\` \\n\" http://h",
+        "curl 'it'\\''s' http://h",
+        "curl -X POST \\\n  -H 'A: b' \\\n  http://h",
+        "curl\t-k\r\n--url\thttp://h",
+        "curl a\"b c\"'d e'f",
+        "curl \\a\\ b \\\\ \\'",
+        "curl '' \"\" x''y",
+        "curl -d 'tiếng việt <b>' http://h",
+        "curl 'unterminated",
+        "curl \"unterminated",
+        "curl trailing\\",
+        "curl \"a\\\"",
+    ]
+
+    def assertSameAsShlex(self, s):
+        self.assertEqual(_outcome(_split_curl, s), _outcome(shlex.split, s), msg=repr(s))
+
+    def test_quoting_and_escaping(self):
+        for s in self.CASES:
+            with self.subTest(s=s):
+                self.assertSameAsShlex(s)
+
+    def test_random_corpus(self):
+        rng = random.Random(20240601)
+        alphabet = ["a", "b", "-", ":", "{", "}", "$", "é", " ", "\t", "\n", "\r", "'", '"', "\\"]
+        for _ in range(20000):
+            s = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            self.assertSameAsShlex(s)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Các endpoint UI (Flask test_client): cache /run, NDJSON, gzip/ETag, /health, clamp concurrency."""
+import gc
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import _target
+from _target import start_target
+
+import api_tester
+
+try:
+    import flask
+except ImportError:  # pragma: no cover
+    flask = None
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@unittest.skipIf(flask is None, "cần Flask")
+class UiTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.base, cls.stop = start_target()
+        cls.client = api_tester.create_app().test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stop()
+
+    def setUp(self):
+        api_tester._RUN_CACHE.clear()
+
+    def curl(self, path="items/1"):
+        return f"curl -X POST {self.base}/{path} -H 'Authorization: Bearer t' -H 'Content-Type: application/json' -d '{{\"name\": \"x\"}}'"
+
+    def post_run(self, curl):
+        resp = self.client.post("/run", json={"curl": curl, "timeout": 5})
+        self.assertEqual(resp.status_code, 200)
+        return resp
+
+    # ---------------- /run ----------------
+    def test_ndjson_framing_and_summary(self):
+        resp = self.post_run(self.curl())
+        self.assertEqual(resp.mimetype, "application/x-ndjson")
+        body = resp.get_data()
+        self.assertTrue(body.endswith(b"\n"))
+        lines = [json.loads(line) for line in body.decode("utf-8").split("\n")[:-1]]
+
+        results, summary = lines[:-1], lines[-1]
+        self.assertTrue(results)
+        self.assertTrue(all(r["type"] == "result" for r in results))
+        self.assertEqual(sorted(r["index"] for r in results), list(range(len(results))))
+        self.assertEqual(summary["type"], "summary")
+        self.assertEqual(summary["summary"]["total"], len(results))
+        self.assertIn("duration_ms", summary["summary"])
+        self.assertIn("elapsed_sum_ms", summary["summary"])
+        self.assertEqual(summary["parsed"]["method"], "POST")
+
+    def test_stream_closed_early_cleans_up(self):
+        # client ngắt giữa chừng: session aiohttp phải đóng xong trước khi event loop đóng
+        pc, cases = api_tester._prepare_run(self.curl(), None)
+        for _ in range(3):
+            with self.assertNoLogs("asyncio"):
+                stream = api_tester.stream_results_ndjson(pc, cases, 5)
+                next(stream)
+                stream.close()
+                gc.collect()
+
+    def test_cache_hit_within_ttl(self):
+        first = self.post_run(self.curl()).get_data()
+        hits = _target.hits()
+        second = self.post_run(self.curl()).get_data()
+        self.assertEqual(second, first)
+        self.assertEqual(_target.hits(), hits)  # không gửi lại request nào tới API đích
+
+        with mock.patch.object(api_tester, "_RUN_TTL", 0.0):
+            self.post_run(self.curl()).get_data()
+        self.assertGreater(_target.hits(), hits)  # hết TTL → chạy lại
+
+    def test_cache_fifo_eviction(self):
+        keys = [(f"curl http://h/{i}", 5, None) for i in range(api_tester._RUN_CACHE_MAX + 1)]
+        for i, key in enumerate(keys):
+            api_tester._run_cache_put(key, str(i).encode())
+        self.assertEqual(len(api_tester._RUN_CACHE), api_tester._RUN_CACHE_MAX)
+        self.assertIsNone(api_tester._run_cache_get(keys[0]))
+        self.assertEqual(api_tester._run_cache_get(keys[1]), b"1")
+        self.assertEqual(api_tester._run_cache_get(keys[-1]), str(len(keys) - 1).encode())
+
+    def test_missing_curl(self):
+        resp = self.client.post("/run", json={})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("error", resp.get_json())
+
+    # ---------------- trang UI, /health ----------------
+    def test_index_etag_per_encoding(self):
+        resp = self.client.get("/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers["Content-Encoding"], "gzip")
+        etag = resp.headers["ETag"]
+        self.assertTrue(etag.endswith('-gz"'), etag)
+
+        resp = self.client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+
+        plain = self.client.get("/")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertNotEqual(plain.headers["ETag"], etag)
+        # ETag bản thường không được khớp bản gzip
+        resp = self.client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["ETag"]})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_health(self):
+        resp = self.client.get("/health")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.mimetype, "application/json")
+        self.assertEqual(resp.get_data(), b'{"ok":true}')
+
+
+class ConcurrencyClampTest(unittest.TestCase):
+    def test_zero_env_is_clamped_to_one(self):
+        base, stop = start_target()
+        self.addCleanup(stop)
+        code = (
+            "import api_tester as a\n"
+            "print(a.DEFAULT_CONCURRENCY, a.DEFAULT_PER_HOST)\n"
+            f"out = a.run_cases('curl -H \"Authorization: Bearer t\" {base}/items', timeout=5)\n"
+            "print(out['summary']['total'] == len(out['results']) > 0)\n"
+        )
+        env = dict(os.environ, API_TESTER_CONCURRENCY="0", API_TESTER_PER_HOST="0")
+        # semaphore 0 sẽ treo mãi → timeout để test fail thay vì treo
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                              capture_output=True, text=True, timeout=30)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.split("\n")[:2], ["1 1", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()